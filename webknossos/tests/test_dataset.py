@@ -345,6 +345,53 @@ def test_create_dataset_with_explicit_header_fields() -> None:
     assure_exported_properties(ds)
 
 
+@pytest.mark.parametrize("output_path", [TESTOUTPUT_DIR, REMOTE_TESTOUTPUT_DIR])
+def test_zarr_sharding(output_path: Path) -> None:
+    ds_path = prepare_dataset_path(DataFormat.Zarr, output_path, "sharded")
+    ds = Dataset(ds_path, voxel_size=(1, 1, 1))
+    layer = ds.add_layer(
+        "color",
+        COLOR_CATEGORY,
+        dtype_per_channel="uint16",
+        num_channels=2,
+        data_format=DataFormat.Zarr,
+    )
+    mag = layer.add_mag("1", chunk_shape=32, chunks_per_shard=(2, 2, 1), compress=True)
+    assert mag.info.chunk_shape == Vec3Int.full(32)
+    assert mag.info.chunks_per_shard == Vec3Int(2, 2, 1)
+    assert mag.info.shard_shape == Vec3Int(64, 64, 32)
+
+    data = (np.random.rand(2, 128, 64, 96) * 1000).astype("uint16")
+    mag.write(data, absolute_offset=(0, 0, 0))
+
+    # One object per shard instead of one per chunk
+    assert len(list(mag.get_bounding_boxes_on_disk())) == 2 * 1 * 3
+    assert np.array_equal(
+        data, mag.read(absolute_offset=(0, 0, 0), size=data.shape[1:])
+    )
+    assert np.array_equal(
+        data[:, 70:90, 10:50, 30:40],
+        mag.read(absolute_offset=(70, 10, 30), size=(20, 40, 10)),
+    )
+    # Reading beyond the written data is padded with zeros
+    padded_data = np.zeros((2, 20, 20, 20), dtype="uint16")
+    padded_data[:, :8, :4, :6] = data[:, 120:, 60:, 90:]
+    assert np.array_equal(
+        padded_data,
+        mag.read(absolute_offset=(120, 60, 90), size=(20, 20, 20)),
+    )
+
+    # Overwriting a single shard keeps the other chunks of the array intact
+    mag.write(np.ones((2, 64, 64, 32), dtype="uint16"), absolute_offset=(64, 0, 32))
+    data[:, 64:128, 0:64, 32:64] = 1
+
+    reopened_mag = Dataset.open(ds_path).get_layer("color").get_mag("1")
+    assert reopened_mag.info.chunks_per_shard == Vec3Int(2, 2, 1)
+    assert np.array_equal(
+        data, reopened_mag.read(absolute_offset=(0, 0, 0), size=data.shape[1:])
+    )
+
+
 @pytest.mark.parametrize("data_format,output_path", DATA_FORMATS_AND_OUTPUT_PATHS)
 def test_open_dataset(data_format: DataFormat, output_path: Path) -> None:
     new_dataset_path = copy_simple_dataset(data_format, output_path)
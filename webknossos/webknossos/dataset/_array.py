@@ -1,19 +1,22 @@
+import json
 import re
 import warnings
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import Enum
 from os.path import relpath
 from pathlib import Path
-from typing import Any, Dict, Iterator, Optional, Type
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 
 import numcodecs
 import numpy as np
 import wkw
 import zarr
+from numcodecs.compat import ensure_bytes
 from upath import UPath
-from zarr.storage import FSStore
+from zarr.storage import FSStore, Store
 
 from ..geometry import BoundingBox, Vec3Int, Vec3IntLike
 from ..utils import warn_deprecated
@@ -33,6 +36,199 @@ def _fsstore_from_path(path: Path, mode: str = "a") -> FSStore:
     return FSStore(url=str(path), mode=mode, **storage_options)
 
 
+_SHARDING_ATTRIBUTE = "sharding"
+_SHARD_INDEX_EMPTY = np.iinfo(np.uint64).max
+_SHARD_INDEX_DTYPE = np.dtype("<u8")
+
+
+class _ShardedStore(Store):
+    """
+    Wraps an `FSStore` so that the inner chunks of a Zarr array are grouped into shards.
+
+    The layout follows the Zarr v3 sharding codec: Each shard is stored under the key of its
+    position in the shard grid and contains the encoded inner chunks, followed by an index
+    with one little-endian `(offset, nbytes)` uint64 pair per inner chunk (C order over x, y, z).
+    Missing chunks are marked with `2^64 - 1` in both fields.
+    Reads only fetch the requested inner chunks using byte-range requests,
+    writes re-assemble and replace complete shards.
+    """
+
+    def __init__(self, store: FSStore, chunks_per_shard: Vec3Int):
+        self._store = store
+        self.chunks_per_shard = chunks_per_shard
+
+    @property
+    def _chunks_per_shard_count(self) -> int:
+        return self.chunks_per_shard.prod()
+
+    @property
+    def _index_nbytes(self) -> int:
+        return self._chunks_per_shard_count * 2 * _SHARD_INDEX_DTYPE.itemsize
+
+    @staticmethod
+    def _is_metadata_key(key: str) -> bool:
+        return key.split("/")[-1].startswith(".")
+
+    def _split_chunk_key(self, key: str) -> Tuple[str, int]:
+        separator = "/" if "/" in key else "."
+        channel, x, y, z = [int(part) for part in key.split(separator)]
+        chunk_index = Vec3Int(x, y, z)
+        shard_index = chunk_index // self.chunks_per_shard
+        x, y, z = chunk_index % self.chunks_per_shard
+        shard_key = separator.join(str(i) for i in (channel,) + shard_index.to_tuple())
+        _, cps_y, cps_z = self.chunks_per_shard
+        return shard_key, (x * cps_y + y) * cps_z + z
+
+    def _group_by_shard(self, keys: Iterable[str]) -> Dict[str, List[Tuple[str, int]]]:
+        keys_by_shard: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+        for key in keys:
+            shard_key, inner_index = self._split_chunk_key(key)
+            keys_by_shard[shard_key].append((key, inner_index))
+        return keys_by_shard
+
+    def _shard_path(self, shard_key: str) -> str:
+        return self._store.map._key_to_str(self._store._normalize_key(shard_key))
+
+    def _decode_index(self, index_bytes: bytes) -> np.ndarray:
+        return np.frombuffer(index_bytes, dtype=_SHARD_INDEX_DTYPE).reshape(-1, 2)
+
+    def _read_index(self, shard_key: str) -> Optional[np.ndarray]:
+        try:
+            index_bytes = self._store.fs.cat_file(
+                self._shard_path(shard_key), start=-self._index_nbytes
+            )
+        except FileNotFoundError:
+            return None
+        return self._decode_index(index_bytes)
+
+    def _read_shard(self, shard_key: str) -> Dict[int, bytes]:
+        try:
+            shard_bytes = self._store[shard_key]
+        except KeyError:
+            return {}
+        index = self._decode_index(shard_bytes[-self._index_nbytes :])
+        return {
+            inner_index: shard_bytes[offset : offset + nbytes]
+            for inner_index, (offset, nbytes) in enumerate(index)
+            if offset != _SHARD_INDEX_EMPTY
+        }
+
+    def _write_shard(self, shard_key: str, chunks: Dict[int, bytes]) -> None:
+        if len(chunks) == 0:
+            if shard_key in self._store:
+                del self._store[shard_key]
+            return
+        index = np.full(
+            (self._chunks_per_shard_count, 2),
+            _SHARD_INDEX_EMPTY,
+            dtype=_SHARD_INDEX_DTYPE,
+        )
+        offset = 0
+        chunks_in_order = []
+        for inner_index in sorted(chunks.keys()):
+            chunk = ensure_bytes(chunks[inner_index])
+            index[inner_index] = (offset, len(chunk))
+            offset += len(chunk)
+            chunks_in_order.append(chunk)
+        chunks_in_order.append(index.tobytes())
+        self._store[shard_key] = b"".join(chunks_in_order)
+
+    def getitems(self, keys: Iterable[str], **_kwargs: Any) -> Dict[str, bytes]:
+        results = {}
+        chunk_keys = []
+        for key in keys:
+            if self._is_metadata_key(key):
+                if key in self._store:
+                    results[key] = self._store[key]
+            else:
+                chunk_keys.append(key)
+
+        for shard_key, keys_in_shard in self._group_by_shard(chunk_keys).items():
+            if 2 * len(keys_in_shard) >= self._chunks_per_shard_count:
+                # Most of the shard is requested, a single request for the whole shard is cheaper.
+                chunks = self._read_shard(shard_key)
+                for key, inner_index in keys_in_shard:
+                    if inner_index in chunks:
+                        results[key] = chunks[inner_index]
+                continue
+
+            index = self._read_index(shard_key)
+            if index is None:
+                continue
+            shard_path = self._shard_path(shard_key)
+            for key, inner_index in keys_in_shard:
+                offset, nbytes = index[inner_index]
+                if offset != _SHARD_INDEX_EMPTY:
+                    results[key] = self._store.fs.cat_file(
+                        shard_path, start=int(offset), end=int(offset + nbytes)
+                    )
+        return results
+
+    def setitems(self, values: Dict[str, Any]) -> None:
+        chunk_values = {}
+        for key, value in values.items():
+            if self._is_metadata_key(key):
+                self._store[key] = value
+            else:
+                chunk_values[key] = value
+
+        for shard_key, keys_in_shard in self._group_by_shard(chunk_values).items():
+            if len(keys_in_shard) == self._chunks_per_shard_count:
+                chunks = {}
+            else:
+                chunks = self._read_shard(shard_key)
+            for key, inner_index in keys_in_shard:
+                chunks[inner_index] = chunk_values[key]
+            self._write_shard(shard_key, chunks)
+
+    def delitems(self, keys: Iterable[str]) -> None:
+        chunk_keys = []
+        for key in keys:
+            if self._is_metadata_key(key):
+                del self._store[key]
+            else:
+                chunk_keys.append(key)
+
+        for shard_key, keys_in_shard in self._group_by_shard(chunk_keys).items():
+            chunks = self._read_shard(shard_key)
+            if len(chunks) == 0:
+                continue
+            for _, inner_index in keys_in_shard:
+                chunks.pop(inner_index, None)
+            self._write_shard(shard_key, chunks)
+
+    def __getitem__(self, key: str) -> bytes:
+        if self._is_metadata_key(key):
+            return self._store[key]
+        results = self.getitems([key])
+        if key not in results:
+            raise KeyError(key)
+        return results[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.setitems({key: value})
+
+    def __delitem__(self, key: str) -> None:
+        if self._is_metadata_key(key):
+            del self._store[key]
+        else:
+            self.delitems([key])
+
+    def __contains__(self, key: Any) -> bool:
+        if self._is_metadata_key(key):
+            return key in self._store
+        shard_key, inner_index = self._split_chunk_key(key)
+        index = self._read_index(shard_key)
+        return index is not None and index[inner_index][0] != _SHARD_INDEX_EMPTY
+
+    def __iter__(self) -> Iterator[str]:
+        # Yields the metadata and shard keys of the underlying store.
+        return iter(self._store)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
 @contextmanager
 def _blosc_disable_threading() -> Iterator[None]:
     old_value = numcodecs.blosc.use_threads
@@ -312,16 +508,20 @@ class ZarrArray(BaseArray):
             voxel_type=zarray.dtype,
             compression_mode=zarray.compressor is not None,
             chunk_shape=Vec3Int(*zarray.chunks[1:4]) or Vec3Int.full(1),
-            chunks_per_shard=Vec3Int.full(1),
+            chunks_per_shard=(
+                zarray.store.chunks_per_shard
+                if isinstance(zarray.store, _ShardedStore)
+                else Vec3Int.full(1)
+            ),
         )
 
     @classmethod
     def create(cls, path: Path, array_info: ArrayInfo) -> "ZarrArray":
         assert array_info.data_format == cls.data_format
-        assert array_info.chunks_per_shard == Vec3Int.full(
-            1
-        ), "Zarr storage doesn't support sharding yet"
-        zarr.create(
+        assert array_info.chunks_per_shard.is_positive(
+            strictly_positive=True
+        ), f"`chunks_per_shard` needs to be positive for Zarr storage. Got {array_info.chunks_per_shard}."
+        zarray = zarr.create(
             shape=(array_info.num_channels, 1, 1, 1),
             chunks=(array_info.num_channels,) + array_info.chunk_shape.to_tuple(),
             dtype=array_info.voxel_type,
@@ -333,6 +533,11 @@ class ZarrArray(BaseArray):
             store=_fsstore_from_path(path),
             order="F",
         )
+        if array_info.chunks_per_shard != Vec3Int.full(1):
+            zarray.attrs[_SHARDING_ATTRIBUTE] = {
+                "chunks_per_shard": array_info.chunks_per_shard.to_list(),
+                "index_location": "end",
+            }
         return ZarrArray(path)
 
     def read(self, offset: Vec3IntLike, shape: Vec3IntLike) -> np.ndarray:
@@ -412,23 +617,41 @@ class ZarrArray(BaseArray):
 
     def list_bounding_boxes(self) -> Iterator[BoundingBox]:
         zarray = self._zarray
-        chunk_shape = Vec3Int(*zarray.chunks[1:4])
+        # For sharded arrays, the store contains one key per shard.
+        shard_shape = self.info.shard_shape
         for key in zarray.store.keys():
             if not key.startswith("."):
                 key_parts = [int(p) for p in key.split(zarray._dimension_separator)]
-                chunk_idx = Vec3Int(key_parts[1:4])
-                yield BoundingBox(topleft=chunk_idx * chunk_shape, size=chunk_shape)
+                shard_idx = Vec3Int(key_parts[1:4])
+                yield BoundingBox(topleft=shard_idx * shard_shape, size=shard_shape)
 
     def close(self) -> None:
         if self._cached_zarray is not None:
             self._cached_zarray = None
 
+    @staticmethod
+    def _read_chunks_per_shard(store: FSStore) -> Optional[Vec3Int]:
+        try:
+            attributes = json.loads(store[".zattrs"])
+        except KeyError:
+            return None
+        if _SHARDING_ATTRIBUTE not in attributes:
+            return None
+        return Vec3Int(attributes[_SHARDING_ATTRIBUTE]["chunks_per_shard"])
+
     @property
     def _zarray(self) -> zarr.Array:
         if self._cached_zarray is None:
             try:
+                store = _fsstore_from_path(self._path)
+                chunks_per_shard = self._read_chunks_per_shard(store)
                 self._cached_zarray = zarr.open_array(
-                    store=_fsstore_from_path(self._path), mode="a"
+                    store=(
+                        store
+                        if chunks_per_shard is None
+                        else _ShardedStore(store, chunks_per_shard)
+                    ),
+                    mode="a",
                 )
             except Exception as e:
                 raise ArrayException(